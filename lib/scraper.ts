@@ -1,4 +1,4 @@
-import { spawn } from "child_process";
+import { spawn, ChildProcessWithoutNullStreams } from "child_process";
 import path from "path";
 import { getPythonPath } from './python-utils';
 
@@ -27,72 +27,15 @@ const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
 // Function to calculate exponential backoff delay
 const getRetryDelay = (attempt: number) => RETRY_DELAY * Math.pow(2, attempt);
 
-// Generic function to run a Python script with retry logic and rate limiting
-const runPythonScript = async (scriptPath: string, arg: string, maxRetries: number = MAX_RETRIES): Promise<any> => {
+// Generic retry wrapper with rate limiting handling, shared by the one-shot
+// scripts and the long-lived product worker
+const withRetries = async (label: string, task: () => Promise<any>, maxRetries: number = MAX_RETRIES): Promise<any> => {
   let lastError: Error | null = null;
 
   for (let attempt = 0; attempt <= maxRetries; attempt++) {
     try {
-      return await new Promise<any>((resolve, reject) => {
-        console.log(`Running ${scriptPath}, attempt ${attempt + 1}/${maxRetries + 1}`);
-
-        // Use an absolute path to prevent issues with the current working directory
-        const absoluteScriptPath = path.join(process.cwd(), scriptPath);
-        const pythonPath = getPythonPath();
-        const pythonProcess = spawn(pythonPath, [absoluteScriptPath, arg]);
-        let data = "";
-        let errorData = "";
-        let timeout: NodeJS.Timeout;
-
-        // Set a timeout for the process.
-        // This should be longer than the Playwright navigation/selector timeouts
-        // so that Python can handle timeouts gracefully and return JSON instead of
-        // being killed mid-run (which can cause EPIPE errors in Playwright's driver).
-        timeout = setTimeout(() => {
-          pythonProcess.kill();
-          reject(new Error(`Process timed out after ${PROCESS_TIMEOUT_MS / 1000} seconds`));
-        }, PROCESS_TIMEOUT_MS);
-
-        pythonProcess.stdout.on("data", (chunk) => (data += chunk.toString()));
-        pythonProcess.stderr.on("data", (chunk) => (errorData += chunk.toString()));
-
-        pythonProcess.on("close", (code) => {
-          clearTimeout(timeout);
-
-          if (code !== 0) {
-            // Combine both stdout and stderr for full error context
-            const fullOutput = `stdout: ${data}\nstderr: ${errorData}`;
-            const errorMessage = `Python script failed with code ${code}\n${fullOutput}`;
-            console.error(`Script ${scriptPath} failed:`, errorMessage);
-            console.error(`Python path used: ${pythonPath}`);
-            console.error(`Script path: ${absoluteScriptPath}`);
-
-            // Check if this is a rate limiting error
-            if (errorData.includes('429') || errorData.includes('rate limit') ||
-                errorData.includes('too many requests') || errorData.includes('blocked')) {
-              reject(new Error('RATE_LIMITED'));
-              return;
-            }
-
-            reject(new Error(errorMessage));
-            return;
-          }
-
-          try {
-            const parsed = JSON.parse(data);
-            console.log(`${scriptPath} completed successfully`);
-            resolve(parsed.data ?? parsed ?? {}); // fallback if JSON structure varies
-          } catch (err) {
-            console.error(`Failed to parse output. stdout: ${data}, stderr: ${errorData}`);
-            reject(new Error("Failed to parse Python script output: " + err));
-          }
-        });
-
-        pythonProcess.on("error", (err) => {
-          clearTimeout(timeout);
-          reject(new Error(`Failed to start Python process: ${err.message}`));
-        });
-      });
+      console.log(`Running ${label}, attempt ${attempt + 1}/${maxRetries + 1}`);
+      return await task();
     } catch (error: any) {
       lastError = error;
       console.error(`Attempt ${attempt + 1} failed:`, error.message);
@@ -112,18 +55,180 @@ const runPythonScript = async (scriptPath: string, arg: string, maxRetries: numb
 
       // For other errors, wait before retrying
       const delay = getRetryDelay(attempt);
-      console.log(`Retrying ${scriptPath} in ${delay}ms...`);
+      console.log(`Retrying ${label} in ${delay}ms...`);
       await sleep(delay);
     }
   }
 
   // If we get here, all retries failed
-  throw lastError || new Error(`All retry attempts failed for ${scriptPath}`);
+  throw lastError || new Error(`All retry attempts failed for ${label}`);
 };
 
+// Generic function to run a Python script once per call with retry logic
+const runPythonScript = (scriptPath: string, arg: string, maxRetries: number = MAX_RETRIES): Promise<any> =>
+  withRetries(scriptPath, () => new Promise<any>((resolve, reject) => {
+    // Use an absolute path to prevent issues with the current working directory
+    const absoluteScriptPath = path.join(process.cwd(), scriptPath);
+    const pythonPath = getPythonPath();
+    const pythonProcess = spawn(pythonPath, [absoluteScriptPath, arg]);
+    let data = "";
+    let errorData = "";
+    let timeout: NodeJS.Timeout;
+
+    // Set a timeout for the process.
+    // This should be longer than the Playwright navigation/selector timeouts
+    // so that Python can handle timeouts gracefully and return JSON instead of
+    // being killed mid-run (which can cause EPIPE errors in Playwright's driver).
+    timeout = setTimeout(() => {
+      pythonProcess.kill();
+      reject(new Error(`Process timed out after ${PROCESS_TIMEOUT_MS / 1000} seconds`));
+    }, PROCESS_TIMEOUT_MS);
+
+    pythonProcess.stdout.on("data", (chunk) => (data += chunk.toString()));
+    pythonProcess.stderr.on("data", (chunk) => (errorData += chunk.toString()));
+
+    pythonProcess.on("close", (code) => {
+      clearTimeout(timeout);
+
+      if (code !== 0) {
+        // Combine both stdout and stderr for full error context
+        const fullOutput = `stdout: ${data}\nstderr: ${errorData}`;
+        const errorMessage = `Python script failed with code ${code}\n${fullOutput}`;
+        console.error(`Script ${scriptPath} failed:`, errorMessage);
+        console.error(`Python path used: ${pythonPath}`);
+        console.error(`Script path: ${absoluteScriptPath}`);
+
+        // Check if this is a rate limiting error
+        if (errorData.includes('429') || errorData.includes('rate limit') ||
+            errorData.includes('too many requests') || errorData.includes('blocked')) {
+          reject(new Error('RATE_LIMITED'));
+          return;
+        }
+
+        reject(new Error(errorMessage));
+        return;
+      }
+
+      try {
+        const parsed = JSON.parse(data);
+        console.log(`${scriptPath} completed successfully`);
+        resolve(parsed.data ?? parsed ?? {}); // fallback if JSON structure varies
+      } catch (err) {
+        console.error(`Failed to parse output. stdout: ${data}, stderr: ${errorData}`);
+        reject(new Error("Failed to parse Python script output: " + err));
+      }
+    });
+
+    pythonProcess.on("error", (err) => {
+      clearTimeout(timeout);
+      reject(new Error(`Failed to start Python process: ${err.message}`));
+    });
+  }), maxRetries);
+
+// Long-lived product worker. scripts/product.py --serve keeps Playwright and
+// Chromium warm and answers one JSON line per request, so only the first
+// scrape pays the browser launch cost.
+const PRODUCT_SCRIPT = "scripts/product.py";
+
+interface PendingRequest {
+  resolve: (value: any) => void;
+  reject: (reason: Error) => void;
+  timeout: NodeJS.Timeout;
+}
+
+let productWorker: ChildProcessWithoutNullStreams | null = null;
+const pendingRequests = new Map<number, PendingRequest>();
+let nextRequestId = 0;
+
+const failPendingRequests = (error: Error) => {
+  for (const [id, pending] of pendingRequests.entries()) {
+    clearTimeout(pending.timeout);
+    pending.reject(error);
+    pendingRequests.delete(id);
+  }
+};
+
+const getProductWorker = (): ChildProcessWithoutNullStreams => {
+  if (productWorker) {
+    return productWorker;
+  }
+
+  const absoluteScriptPath = path.join(process.cwd(), PRODUCT_SCRIPT);
+  const pythonPath = getPythonPath();
+  const worker = spawn(pythonPath, [absoluteScriptPath, "--serve"]);
+  let buffer = "";
+
+  worker.stdout.on("data", (chunk) => {
+    buffer += chunk.toString();
+    let newline: number;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (!line) continue;
+
+      let parsed: any;
+      try {
+        parsed = JSON.parse(line);
+      } catch (err) {
+        console.error(`Failed to parse product worker output: ${line}`);
+        continue;
+      }
+
+      const pending = pendingRequests.get(parsed.id);
+      if (!pending) continue;
+      pendingRequests.delete(parsed.id);
+      clearTimeout(pending.timeout);
+      pending.resolve(parsed.data ?? parsed ?? {}); // fallback if JSON structure varies
+    }
+  });
+
+  worker.stderr.on("data", (chunk) => console.log(`[product worker] ${chunk.toString().trimEnd()}`));
+
+  worker.on("close", (code) => {
+    console.error(`Product worker exited with code ${code}`);
+    if (productWorker === worker) productWorker = null;
+    failPendingRequests(new Error(`Product worker exited with code ${code}`));
+  });
+
+  // Writing to a worker that died before "close" fired raises EPIPE on stdin;
+  // fail its requests instead of letting the stream error crash the server
+  worker.stdin.on("error", (err) => {
+    console.error(`Product worker stdin error: ${err.message}`);
+    if (productWorker === worker) productWorker = null;
+    failPendingRequests(new Error(`Product worker stdin error: ${err.message}`));
+  });
+
+  worker.on("error", (err) => {
+    console.error(`Python path used: ${pythonPath}`);
+    console.error(`Script path: ${absoluteScriptPath}`);
+    if (productWorker === worker) productWorker = null;
+    failPendingRequests(new Error(`Failed to start Python process: ${err.message}`));
+  });
+
+  productWorker = worker;
+  return worker;
+};
+
+// Closing stdin lets the worker shut its browser down cleanly
+process.once("exit", () => productWorker?.stdin.end());
+
+const requestProductWorker = (url: string): Promise<any> =>
+  new Promise<any>((resolve, reject) => {
+    const worker = getProductWorker();
+    const id = nextRequestId++;
+
+    const timeout = setTimeout(() => {
+      pendingRequests.delete(id);
+      reject(new Error(`Process timed out after ${PROCESS_TIMEOUT_MS / 1000} seconds`));
+    }, PROCESS_TIMEOUT_MS);
+
+    pendingRequests.set(id, { resolve, reject, timeout });
+    worker.stdin.write(JSON.stringify({ id, url }) + "\n");
+  });
+
 // Scrape product data
 export const scrapeAmazonProduct = async (url: string): Promise<ProductData> => {
-  const data = await runPythonScript("scripts/product.py", url);
+  const data = await withRetries(PRODUCT_SCRIPT, () => requestProductWorker(url));
   return {
     asin: data.asin ?? "N/A",
     title: data.title ?? "N/A",
@@ -0,0 +1,64 @@
+import json
+import os
+import random
+import sys
+import tracemalloc
+from itertools import accumulate
+
+# orjson encodes in C and is much faster than the stdlib on large results
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# User agents for rotation, shared by the product and review scrapers
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15"
+]
+
+# Relative weights roughly following desktop browser market share (Chrome on Windows dominates)
+WEIGHTS = [40, 15, 15, 5, 10, 15]
+
+# Precomputed so random.choices doesn't rebuild the cumulative sums on every call
+_CUM_WEIGHTS = list(accumulate(WEIGHTS))
+
+# Request headers common to every scraper; callers add User-Agent and any
+# transport-specific headers on top
+DEFAULT_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "DNT": "1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+def get_random_user_agent():
+    """Get a user agent from the list, weighted towards the most common browsers"""
+    return random.choices(USER_AGENTS, cum_weights=_CUM_WEIGHTS, k=1)[0]
+
+def dumps(obj, pretty=False):
+    """Serialize a result for stdout; compact unless pretty output was requested"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    return json.dumps(obj, indent=2 if pretty else None, ensure_ascii=False)
+
+def parse_output_args(argv):
+    """Split the --pretty flag (human-readable JSON for debugging) from the other arguments"""
+    args = [arg for arg in argv[1:] if arg != "--pretty"]
+    return args, len(args) != len(argv) - 1
+
+def start_memory_trace():
+    """Start tracemalloc when SCRAPER_TRACE_MEMORY is set"""
+    if os.environ.get("SCRAPER_TRACE_MEMORY"):
+        tracemalloc.start()
+
+def report_memory_trace():
+    """Print current and peak traced memory to stderr if tracing is on"""
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"Memory: {current / 1024 / 1024:.1f} MiB current, {peak / 1024 / 1024:.1f} MiB peak", file=sys.stderr)
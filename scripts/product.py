@@ -2,33 +2,54 @@ import sys
 import json
 import re
 import time
+import os
 import random
 import asyncio
+import aiohttp
+from lxml import etree
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser
+
+from _common import (
+    DEFAULT_HEADERS, dumps, get_random_user_agent, parse_output_args,
+    report_memory_trace, start_memory_trace
+)
 
 # Fix Windows encoding issues
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# Use uvloop's faster event loop where it's installed (not available on Windows,
+# where the default Proactor loop is kept since Playwright needs its subprocess support)
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    run_async = asyncio.run
+
 # Retry configuration - Optimized for speed
 # Keep retries low so the overall script duration stays reasonable when called from Node
 MAX_RETRIES = 1  # At most 2 total attempts per process
 RETRY_DELAY = 3  # Reduced delay for quicker retries
 
-# User agents for rotation
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15"
-]
+# Patterns used on every scrape, compiled once at import
+_ASIN_RE = re.compile(r'/(dp|gp/product|ASIN)/([A-Z0-9]{10})')
+_DIGITS_ONLY = re.compile(r'[^0-9]')
+_RATING_RE = re.compile(r'(\d+[\.,]?\d*)')
+_IMG_RE = re.compile(r'\._AC_.*?_\.')
 
-def get_random_user_agent():
-    """Get a random user agent from the list"""
-    return random.choice(USER_AGENTS)
+def _normalize_img(src: str) -> str:
+    """
+    Rewrite an image URL's ._AC_<size>_. token to the 1500px variant. The
+    common single-token URL is handled with str.partition; anything else
+    falls back to _IMG_RE.
+    """
+    head, sep, tail = src.partition('._AC_')
+    if not sep or '._AC_' in tail:
+        return _IMG_RE.sub('._AC_SL1500_.', src)
+    _, sep, rest = tail.partition('_.')
+    return head + '._AC_SL1500_.' + rest if sep else src
 
 async def sleep_with_jitter(base_delay):
     """Sleep with random jitter to avoid detection"""
@@ -39,16 +60,375 @@ def calculate_retry_delay(attempt):
     """Calculate exponential backoff delay"""
     return RETRY_DELAY * (2 ** attempt)
 
-if len(sys.argv) < 2:
-    print(json.dumps({"error": "Please provide the Amazon product URL."}))
-    sys.exit(1)
+# Context pool configuration - how many scrapes a worker runs in parallel and
+# how many pages a context serves before it is replaced
+POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "8"))
+MAX_PAGES_PER_CONTEXT = int(os.environ.get("SCRAPER_CONTEXT_MAX_PAGES", "50"))
+
+# Chromium launch flags, applied once when the worker starts the browser.
+# Background services, extensions and throttling are turned off to cut
+# per-context memory and page init time.
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--no-first-run',
+    '--disable-default-apps',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-ipc-flooding-protection',
+    # Chromium only honours the last --disable-features flag, so keep them in one list
+    '--disable-features=VizDisplayCompositor,Translate,OptimizationHints,MediaRouter,InterestFeedContentSuggestions',
+    '--mute-audio',
+    '--blink-settings=imagesEnabled=false',  # belt-and-braces with block_unneeded_resources
+    '--window-size=1920,1080'
+]
+
+# Optional installed browser channel (e.g. "chrome"); defaults to the bundled Chromium
+BROWSER_CHANNEL = os.environ.get("SCRAPER_BROWSER_CHANNEL") or None
+
+# The browser decodes brotli itself, so it can advertise it
+EXTRA_HTTP_HEADERS = {
+    **DEFAULT_HEADERS,
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+}
+
+# Plain HTTP fast path - DEFAULT_HEADERS only advertise gzip/deflate, which aiohttp decodes natively
+FAST_PATH_HEADERS = DEFAULT_HEADERS
+FAST_PATH_TIMEOUT = aiohttp.ClientTimeout(total=15)
+# Sections whose closing tags mark the end of everything the fast path reads;
+# the rest of the page (reviews, recommendations, footer) is never downloaded
+STREAM_STOP_IDS = frozenset(('productTitle', 'feature-bullets', 'productDescription'))
+STREAM_CHUNK_SIZE = 16384
+# Amazon's robot-check page links this address; its presence means we were blocked
+CAPTCHA_MARKER = "api-services-support@amazon.com"
+
+# Apply stealth measures manually to make the browser less detectable.
+STEALTH_SCRIPT = """
+  Object.defineProperty(navigator, 'webdriver', { get: () => false });
+  Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+  Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
+  Object.defineProperty(navigator, 'platform', { get: () => 'Win32' });
+  Object.defineProperty(navigator, 'cookieEnabled', { get: () => true });
+"""
+
+# Resources the scraper never reads - only the DOM text and <img> src attributes
+# are needed, so these are aborted before they hit the network
+BLOCKED_RESOURCE_TYPES = ("image", "font", "stylesheet", "media")
+BLOCKED_URL_PARTS = ("doubleclick", "googletagmanager", "adsystem", "amazon-adsystem", "fls-na.amazon")
+
+# Reads every product field in-page and returns them as one JSON object, so
+# extraction costs a single round trip instead of one per locator call
+PRODUCT_EXTRACTOR_JS = """
+() => {
+  const q = s => document.querySelector(s);
+  const txt = e => (e && e.innerText.trim()) || null;
+  return {
+    title: (q('input[name="productTitle"]')?.value || '').trim() || txt(q('#productTitle')),
+    price: txt(q('span.a-price .a-offscreen')),
+    original_price: txt(q('span[data-a-strike="true"] span.a-offscreen')),
+    discount: txt(q('span.savingsPercentage')),
+    rating: q('#acrPopover')?.getAttribute('title') || null,
+    reviewCount: txt(q('#acrCustomerReviewText')),
+    availability: txt(q('#availability')),
+    features: [...document.querySelectorAll('#feature-bullets ul li span.a-list-item')]
+      .map(e => e.innerText.trim()).filter(Boolean),
+    description: txt(q('#productDescription')),
+    images: [...document.querySelectorAll('#altImages ul li span.a-button-text img')]
+      .map(i => i.getAttribute('src')).filter(Boolean),
+  };
+}
+"""
+
+async def block_unneeded_resources(route):
+    """Route handler that aborts images, fonts, stylesheets, media and trackers"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return await route.abort()
+    if any(part in request.url for part in BLOCKED_URL_PARTS):
+        return await route.abort()
+    await route.continue_()
+
+async def launch_browser():
+    """Start Playwright and a headless Chromium that can be shared across scrapes"""
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(headless=True, channel=BROWSER_CHANNEL, args=BROWSER_ARGS)
+    except Exception:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+async def shutdown_browser(playwright, browser):
+    """Close the shared browser and stop the Playwright driver"""
+    try:
+        await browser.close()
+    finally:
+        await playwright.stop()
+
+class ContextPool:
+    """
+    Fixed-size pool of browser contexts shared by concurrent scrapes.
+
+    The semaphore caps how many scrapes run at once; the queue hands each of
+    them a warm context. A context is closed and replaced once it has served
+    max_pages pages so long-running workers don't keep growing in memory.
+    """
+
+    def __init__(self, browser, size: int = POOL_SIZE, max_pages: int = MAX_PAGES_PER_CONTEXT):
+        self.browser = browser
+        self.size = size
+        self.max_pages = max_pages
+        self.semaphore = asyncio.BoundedSemaphore(size)
+        self._queue = asyncio.Queue()
+        self._page_counts = {}
+
+    async def _new_context(self):
+        context = await self.browser.new_context(
+            user_agent=get_random_user_agent(),
+            extra_http_headers=EXTRA_HTTP_HEADERS
+        )
+        await context.add_init_script(STEALTH_SCRIPT)
+        await context.route("**/*", block_unneeded_resources)
+        self._page_counts[context] = 0
+        return context
+
+    async def _close_context(self, context):
+        self._page_counts.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"Warning: Could not close browser context: {e}", file=sys.stderr)
+
+    async def start(self):
+        """Pre-create the pool's contexts concurrently; slots that fail are filled lazily"""
+        results = await asyncio.gather(
+            *(self._new_context() for _ in range(self.size)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Warning: Could not create browser context: {result}", file=sys.stderr)
+                result = None
+            self._queue.put_nowait(result)
+
+    async def acquire(self):
+        """Take a context out of the pool, creating one if the slot is empty"""
+        context = await self._queue.get()
+        if context is None:
+            try:
+                context = await self._new_context()
+            except Exception:
+                self._queue.put_nowait(None)
+                raise
+        self._page_counts[context] += 1
+        return context
+
+    async def release(self, context):
+        """Return a context to the pool, recycling it once it has served max_pages"""
+        if self._page_counts.get(context, 0) >= self.max_pages:
+            await self._close_context(context)
+            context = None
+        self._queue.put_nowait(context)
+
+    async def close(self):
+        """Close every idle context in the pool concurrently"""
+        contexts = []
+        while not self._queue.empty():
+            context = self._queue.get_nowait()
+            if context is not None:
+                contexts.append(context)
+        await asyncio.gather(*(self._close_context(context) for context in contexts))
+
+async def scrape_product_page(page, url: str, data: dict):
+    """Navigate an open page to the product URL and fill data from the DOM"""
+    # Return as soon as the response starts; the selector wait below is the real readiness signal
+    await page.goto(url, wait_until="commit", timeout=30000)  # Reduced to 30s
+
+    # Wait for a key element to ensure the page is loaded correctly.
+    # "attached" is enough since we only read text/values, not layout.
+    await page.wait_for_selector("#productTitle", state="attached", timeout=15000)  # Reduced to 15s
+
+    # Fields further down (bullets, description) need the parser to have finished,
+    # but not the deferred scripts and handlers that DOMContentLoaded waits for
+    await page.wait_for_function("document.readyState !== 'loading'", timeout=15000)
+
+    # --- Scrape Data ---
+    # All fields are read in-page by one evaluate call (a single CDP round trip)
+    raw = await page.evaluate(PRODUCT_EXTRACTOR_JS)
+    fill_product_data(data, raw)
+
+def fill_product_data(data: dict, raw: dict):
+    """Clean up the raw extracted fields (browser or HTTP path) into data"""
+    if raw.get('title'):
+        data['title'] = raw['title']
+    else:
+        print("Warning: Could not extract title", file=sys.stderr)
+
+    if raw.get('price'):
+        data['price'] = raw['price']
+
+    if raw.get('original_price'):
+        data['original_price'] = raw['original_price']
+
+    if raw.get('discount'):
+        data['discount_percentage'] = _DIGITS_ONLY.sub('', raw['discount'])
+
+    # Rating
+    match = _RATING_RE.search(raw.get('rating') or "")
+    if match:
+        data['rating'] = match.group(1).replace(',', '.')
+
+    # Review Count
+    if raw.get('reviewCount'):
+        data['reviewCount'] = _DIGITS_ONLY.sub('', raw['reviewCount'].split()[0])
+
+    if raw.get('availability'):
+        data['availability'] = raw['availability']
+
+    # Features (Bullet Points)
+    data['features'] = raw.get('features') or []
+
+    if raw.get('description'):
+        data['description'] = raw['description']
+
+    # Images
+    images = [_normalize_img(src) for src in raw.get('images') or []]
+    # Filter out placeholder/blank images
+    data['images'] = [img for img in images if 'images/I/01' not in img]
+
+# Elements innerText puts on their own lines; <p> also gets a blank line around it
+_BLOCK_TAGS = frozenset(('div', 'ul', 'ol', 'li', 'table', 'tr', 'section', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+_BLANK_LINES = re.compile(r'\n{3,}')
+_SPACES = re.compile(r'\s+')
+
+class _FastPathFailed(Exception):
+    """The plain HTTP fetch couldn't produce a usable product page"""
+
+def parse_product_html(html: str) -> dict:
+    """Extract the same raw fields as PRODUCT_EXTRACTOR_JS from static HTML"""
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(['script', 'style', 'noscript'])
+
+    def q(selector):
+        return tree.css_first(selector)
+
+    def txt(node):
+        if node is None:
+            return None
+        # Collapse whitespace the way innerText would for these inline fields
+        return ' '.join(node.text().split()) or None
+
+    def block_txt(node):
+        if node is None:
+            return None
+        # Approximate innerText for block content: keep line and paragraph breaks
+        parts = []
+        for child in node.traverse(include_text=True):
+            if child.tag == '-text':
+                parts.append(_SPACES.sub(' ', child.text_content))
+            elif child.tag == 'br':
+                parts.append('\n')
+            elif child.tag == 'p':
+                parts.append('\n\n')
+            elif child.tag in _BLOCK_TAGS:
+                parts.append('\n')
+        text = '\n'.join(line.strip() for line in ''.join(parts).split('\n'))
+        return _BLANK_LINES.sub('\n\n', text).strip() or None
+
+    title_input = q('input[name="productTitle"]')
+    rating = q('#acrPopover')
+    return {
+        "title": ((title_input.attributes.get('value') or '').strip() if title_input is not None else '') or txt(q('#productTitle')),
+        "price": txt(q('span.a-price .a-offscreen')),
+        "original_price": txt(q('span[data-a-strike="true"] span.a-offscreen')),
+        "discount": txt(q('span.savingsPercentage')),
+        "rating": rating.attributes.get('title') if rating is not None else None,
+        "reviewCount": txt(q('#acrCustomerReviewText')),
+        "availability": txt(q('#availability')),
+        "features": [t for t in (txt(n) for n in tree.css('#feature-bullets ul li span.a-list-item')) if t],
+        "description": block_txt(q('#productDescription')),
+        "images": [src for src in (n.attributes.get('src') for n in tree.css('#altImages ul li span.a-button-text img')) if src],
+    }
+
+class _ProductPageWatcher:
+    """
+    Incrementally parses a streamed product page and reports when every
+    STREAM_STOP_IDS section has been closed, so the download can stop early.
+    Never reports done on pages where a section is missing or unparseable.
+    """
+
+    def __init__(self):
+        self._parser = etree.HTMLPullParser(events=('end',))
+        self._closed = set()
+        self._failed = False
+
+    @property
+    def done(self) -> bool:
+        return not self._failed and self._closed >= STREAM_STOP_IDS
 
-product_url = sys.argv[1]
+    def feed(self, chunk: bytes):
+        if self._failed:
+            return
+        try:
+            self._parser.feed(chunk)
+            for _, element in self._parser.read_events():
+                element_id = element.get('id')
+                if element_id in STREAM_STOP_IDS:
+                    self._closed.add(element_id)
+        except etree.LxmlError:
+            # Fall back to reading the whole page
+            self._failed = True
 
-async def scrape_amazon_product(url: str, attempt: int = 0) -> dict:
+async def scrape_fast(session, url: str, data: dict):
     """
-    Scrapes product data from an Amazon product page URL using Playwright,
-    emulating a real browser to avoid getting blocked.
+    Fast path: fetch the product page over plain HTTP and parse it with
+    selectolax. Raises _FastPathFailed when the response isn't a usable
+    product page (blocked, captcha, missing title) so the caller can fall
+    back to the browser.
+    """
+    headers = {**FAST_PATH_HEADERS, 'User-Agent': get_random_user_agent()}
+    try:
+        async with session.get(url, headers=headers) as response:
+            if response.status != 200:
+                raise _FastPathFailed(f"HTTP {response.status}")
+
+            watcher = _ProductPageWatcher()
+            chunks = []
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+                watcher.feed(chunk)
+                if watcher.done:
+                    # Everything we extract has arrived; skip the rest of the page
+                    response.close()
+                    break
+            html = b''.join(chunks).decode(response.charset or 'utf-8', errors='replace')
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise _FastPathFailed(f"request failed: {e!r}")
+
+    if CAPTCHA_MARKER in html:
+        raise _FastPathFailed("captcha page")
+
+    raw = parse_product_html(html)
+    if not raw.get('title'):
+        raise _FastPathFailed("product title not found")
+    fill_product_data(data, raw)
+
+def create_http_session():
+    """Shared aiohttp session for fast-path fetches, pooled to the worker's concurrency"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=POOL_SIZE),
+        timeout=FAST_PATH_TIMEOUT
+    )
+
+def new_product_data(url: str) -> dict:
+    """
+    Build the default product record for a URL. Raises ValueError with a
+    user-facing message when the URL has no ASIN.
     """
     data = {
         "asin": "N/A",
@@ -66,191 +446,198 @@ async def scrape_amazon_product(url: str, attempt: int = 0) -> dict:
 
     # Extract ASIN from URL - this is generally domain-agnostic
     try:
-        asin_match = re.search(r'/(dp|gp/product|ASIN)/([A-Z0-9]{10})', url.split('?')[0])
-        if not asin_match:
-            return {"error": "Could not find a valid 10-character ASIN in the URL. Please check the link."}
-        data["asin"] = asin_match.group(2)
+        asin_match = _ASIN_RE.search(url.split('?')[0])
     except Exception as e:
-        return {"error": f"Invalid URL format: {e}"}
+        raise ValueError(f"Invalid URL format: {e}")
+    if not asin_match:
+        raise ValueError("Could not find a valid 10-character ASIN in the URL. Please check the link.")
+    data["asin"] = asin_match.group(2)
+    return data
 
-    async with async_playwright() as p:
-        try:
-            print(f"Attempting to scrape product (attempt {attempt + 1}/{MAX_RETRIES + 1})", file=sys.stderr)
+async def try_fast_path(session, url: str, data: dict) -> bool:
+    """Fill data over plain HTTP; returns False when the browser is needed"""
+    try:
+        await scrape_fast(session, url, data)
+    except _FastPathFailed as e:
+        print(f"Fast path failed ({e}), falling back to browser", file=sys.stderr)
+        return False
+    print("Scraped product via HTTP fast path", file=sys.stderr)
+    return True
 
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--no-first-run',
-                    '--disable-default-apps',
-                    '--disable-features=VizDisplayCompositor',
-                    '--window-size=1920,1080'
-                ]
-            )
-            context = await browser.new_context(
-                user_agent=get_random_user_agent(),
-                extra_http_headers={
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                }
-            )
-            page = await context.new_page()
-
-            # Apply stealth measures manually to make the browser less detectable.
-            stealth_script = """
-              Object.defineProperty(navigator, 'webdriver', { get: () => false });
-              Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
-              Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
-              Object.defineProperty(navigator, 'platform', { get: () => 'Win32' });
-              Object.defineProperty(navigator, 'cookieEnabled', { get: () => true });
-            """
-            await page.add_init_script(stealth_script)
-
-            # Minimal delay before navigation for speed
-            await sleep_with_jitter(1)  # Reduced from 3 to 1 second
-
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)  # Reduced to 30s
-
-            # Wait for a key element to ensure the page is loaded correctly
-            await page.wait_for_selector("#productTitle", timeout=15000)  # Reduced to 15s
-
-            # Minimal delay after page load
-            await sleep_with_jitter(0.5)  # Reduced delay
-
-            # --- Scrape Data ---
-            try:
-                # First, try to get the full title from the hidden input field
-                hidden_input = page.locator('input[name="productTitle"]').first
-                if await hidden_input.count():
-                    title_value = await hidden_input.get_attribute('value')
-                    if title_value and title_value.strip():
-                        data['title'] = title_value.strip()
-                    else:
-                        raise Exception("Hidden input exists but has no value")
-                else:
-                    # Fallback to visible span element if hidden input doesn't exist
-                    visible_title = page.locator('span#productTitle').first
-                    if await visible_title.count():
-                        data['title'] = (await visible_title.inner_text(timeout=20000)).strip()
-                    else:
-                        # Final fallback to any element with productTitle ID
-                        data['title'] = (await page.locator('#productTitle').first.inner_text(timeout=20000)).strip()
-            except Exception as e:
-                print(f"Warning: Could not extract title: {e}", file=sys.stderr)
-
-            # Price
-            try:
-                price_elem = page.locator('span.a-price .a-offscreen').first
-                if await price_elem.count():
-                    data['price'] = await price_elem.inner_text()
-            except Exception as e:
-                print(f"Warning: Could not extract price: {e}", file=sys.stderr)
+async def scrape_amazon_product(pool: ContextPool, session, url: str) -> dict:
+    """
+    Scrapes product data from an Amazon product page URL. A plain HTTP fetch
+    is tried first; if that fails validation the page is loaded with
+    Playwright, emulating a real browser to avoid getting blocked.
+    """
+    try:
+        data = new_product_data(url)
+    except ValueError as e:
+        return {"error": str(e)}
 
-            # Original Price & Discount
-            try:
-                original_price_elem = page.locator('span[data-a-strike="true"] span.a-offscreen').first
-                if await original_price_elem.count():
-                    data['original_price'] = await original_price_elem.inner_text()
-
-                discount_elem = page.locator('span.savingsPercentage').first
-                if await discount_elem.count():
-                    discount_text = (await discount_elem.inner_text()).strip()
-                    data['discount_percentage'] = re.sub(r'[^0-9]', '', discount_text)
-            except Exception as e:
-                print(f"Warning: Could not extract pricing info: {e}", file=sys.stderr)
-
-            # Rating
-            try:
-                rating_elem = page.locator('#acrPopover').first
-                if await rating_elem.count():
-                    rating_text = await rating_elem.get_attribute("title") or ""
-                    match = re.search(r'(\d+[\.,]?\d*)', rating_text)
-                    if match:
-                        data['rating'] = match.group(1).replace(',', '.')
-            except Exception as e:
-                print(f"Warning: Could not extract rating: {e}", file=sys.stderr)
-
-            # Review Count
-            try:
-                review_count_elem = page.locator('#acrCustomerReviewText').first
-                if await review_count_elem.count():
-                    review_count_text = (await review_count_elem.inner_text()).strip()
-                    data['reviewCount'] = re.sub(r'[^\d]', '', review_count_text.split()[0])
-            except Exception as e:
-                print(f"Warning: Could not extract review count: {e}", file=sys.stderr)
-
-            # Availability
-            try:
-                availability_elem = page.locator('#availability').first
-                if await availability_elem.count():
-                    data['availability'] = (await availability_elem.inner_text()).strip()
-            except Exception as e:
-                print(f"Warning: Could not extract availability: {e}", file=sys.stderr)
+    if await try_fast_path(session, url, data):
+        return {"data": data}
+    return await scrape_with_browser(pool, url, data)
 
-            # Features (Bullet Points)
-            try:
-                features = await page.locator('#feature-bullets ul li span.a-list-item').all()
-                data['features'] = [(await f.inner_text()).strip() for f in features if (await f.inner_text()).strip()]
-            except Exception as e:
-                print(f"Warning: Could not extract features: {e}", file=sys.stderr)
+async def scrape_with_browser(pool: ContextPool, url: str, data: dict) -> dict:
+    """
+    Load the product page in a pooled browser context and fill data from it.
 
-            # Description
-            try:
-                desc_elem = page.locator('#productDescription').first
-                if await desc_elem.count():
-                    data['description'] = (await desc_elem.inner_text()).strip()
-            except Exception as e:
-                print(f"Warning: Could not extract description: {e}", file=sys.stderr)
+    Retries reuse the warm browser and only open a fresh page; the pooled
+    context is returned before the backoff so a retry never waits on it.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            print(f"Attempting to scrape product (attempt {attempt + 1}/{MAX_RETRIES + 1})", file=sys.stderr)
+
+            async with pool.semaphore:
+                context = await pool.acquire()
+                page = None
+                try:
+                    page = await context.new_page()
+                    await scrape_product_page(page, url, data)
+                finally:
+                    try:
+                        if page is not None:
+                            await page.close()
+                    finally:
+                        await pool.release(context)
 
-            # Images
-            try:
-                image_elems = await page.locator('#altImages ul li span.a-button-text img').all()
-                images = [re.sub(r'\._AC_.*?_\.', '._AC_SL1500_.', await img.get_attribute("src") or "") for img in image_elems]
-                # Filter out placeholder/blank images
-                data['images'] = [img for img in images if img and 'images/I/01' not in img]
-            except Exception as e:
-                print(f"Warning: Could not extract images: {e}", file=sys.stderr)
-
-            await browser.close()
             return {"data": data}
 
         except PlaywrightTimeoutError:
-            if attempt < MAX_RETRIES:
-                delay = calculate_retry_delay(attempt)
-                print(f"Timeout occurred. Retrying in {delay} seconds...", file=sys.stderr)
-                await sleep_with_jitter(delay)
-                return await scrape_amazon_product(url, attempt + 1)
-            else:
+            if attempt == MAX_RETRIES:
                 return {"error": f"Timeout while loading page after {MAX_RETRIES + 1} attempts: {url}. The page may be blocked or too slow."}
+            delay = calculate_retry_delay(attempt)
+            print(f"Timeout occurred. Retrying in {delay} seconds...", file=sys.stderr)
 
         except Exception as e:
             error_msg = str(e)
-            if attempt < MAX_RETRIES:
-                # Check if this looks like a rate limiting or blocking error
-                if any(keyword in error_msg.lower() for keyword in ['blocked', 'rate limit', 'too many requests', '429', 'captcha', 'access denied']):
-                    delay = calculate_retry_delay(attempt)
-                    print(f"Rate limiting detected. Retrying in {delay} seconds...", file=sys.stderr)
-                    await sleep_with_jitter(delay)
-                    return await scrape_amazon_product(url, attempt + 1)
-                else:
-                    delay = calculate_retry_delay(attempt)
-                    print(f"Error occurred: {error_msg}. Retrying in {delay} seconds...", file=sys.stderr)
-                    await sleep_with_jitter(delay)
-                    return await scrape_amazon_product(url, attempt + 1)
-            else:
+            if attempt == MAX_RETRIES:
                 return {"error": f"Failed after {MAX_RETRIES + 1} attempts: {error_msg}"}
+            delay = calculate_retry_delay(attempt)
+            # Check if this looks like a rate limiting or blocking error
+            if any(keyword in error_msg.lower() for keyword in ['blocked', 'rate limit', 'too many requests', '429', 'captcha', 'access denied']):
+                print(f"Rate limiting detected. Retrying in {delay} seconds...", file=sys.stderr)
+            else:
+                print(f"Error occurred: {error_msg}. Retrying in {delay} seconds...", file=sys.stderr)
+
+        await sleep_with_jitter(delay)
+
+def write_response(payload: dict):
+    """Write one JSON response line to stdout for the Node side to pick up"""
+    sys.stdout.write(dumps(payload) + "\n")
+    sys.stdout.flush()
+
+async def handle_request(pool: ContextPool, session, line: str):
+    """Scrape the URL from one request line and answer with the same request id"""
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        url = request.get("url")
+        if not url:
+            result = {"error": "Please provide the Amazon product URL."}
+        else:
+            result = await scrape_amazon_product(pool, session, url)
+    except Exception as e:
+        result = {"error": f"Unexpected error: {str(e)}"}
+    write_response({"id": request_id, **result})
+
+async def serve():
+    """
+    Long-lived worker mode: keep Playwright and the browser warm and answer
+    line-delimited JSON requests ({"id": ..., "url": ...}) read from stdin.
+    Exits and closes the browser once stdin is closed. If Chromium crashes or
+    disconnects the worker exits with status 1 so the Node side respawns it.
+    """
+    loop = asyncio.get_running_loop()
+    playwright, browser = await launch_browser()
+    browser_lost = asyncio.Event()
+    browser.on("disconnected", lambda _: browser_lost.set())
+    lost = asyncio.ensure_future(browser_lost.wait())
+    pool = ContextPool(browser)
+    session = create_http_session()
+    tasks = set()
+    crashed = False
+    try:
+        await pool.start()
+        print(f"Product worker ready ({pool.size} contexts)", file=sys.stderr)
+        while True:
+            read = loop.run_in_executor(None, sys.stdin.readline)
+            await asyncio.wait((read, lost), return_when=asyncio.FIRST_COMPLETED)
+            if lost.done():
+                crashed = True
+                print("Browser disconnected, exiting so the worker is restarted", file=sys.stderr)
+                break
+            line = read.result()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(handle_request(pool, session, line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        lost.cancel()
+        await session.close()
+        await pool.close()
+        await shutdown_browser(playwright, browser)
+
+    if crashed:
+        # The stdin reader thread is still blocked in readline and would hold up
+        # interpreter shutdown, so exit right away
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(1)
+
+async def scrape_once(url: str) -> dict:
+    """
+    One-shot mode: try the HTTP fast path, and only launch a browser for the
+    URL (and shut it down again) when that fails
+    """
+    try:
+        data = new_product_data(url)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    async with create_http_session() as session:
+        if await try_fast_path(session, url, data):
+            return {"data": data}
+
+    playwright, browser = await launch_browser()
+    pool = ContextPool(browser, size=1)
+    try:
+        await pool.start()
+        return await scrape_with_browser(pool, url, data)
+    finally:
+        await pool.close()
+        await shutdown_browser(playwright, browser)
 
 if __name__ == "__main__":
+    args, pretty = parse_output_args(sys.argv)
+    if not args:
+        print(dumps({"error": "Please provide the Amazon product URL."}))
+        sys.exit(1)
+
+    start_memory_trace()
+
+    if args[0] == "--serve":
+        try:
+            run_async(serve())
+        except KeyboardInterrupt:
+            pass
+        report_memory_trace()
+        sys.exit(0)
+
+    product_url = args[0]
     try:
-        result = asyncio.run(scrape_amazon_product(product_url))
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        result = run_async(scrape_once(product_url))
+        print(dumps(result, pretty=pretty))
     except Exception as e:
-        print(json.dumps({"error": f"Unexpected error: {str(e)}"}))
+        print(dumps({"error": f"Unexpected error: {str(e)}"}))
         sys.exit(1)
+    finally:
+        report_memory_trace()
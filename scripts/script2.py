@@ -1,185 +1,399 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+from selectolax.lexbor import LexborHTMLParser
 import json
-import time
+import os
 import random
+import re
+import sqlite3
 import sys
-from urllib.parse import urlparse
+import tempfile
+import time
+from urllib.parse import urlencode, urlparse
+
+from _common import (
+    DEFAULT_HEADERS, dumps, get_random_user_agent, parse_output_args,
+    report_memory_trace, start_memory_trace
+)
 
 # Fix Windows encoding issues
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# Use uvloop's faster event loop where it's installed; on Windows use the selector
+# loop, which avoids the Proactor loop's noisy shutdown errors
+try:
+    import uvloop
+    run_async = uvloop.run
+except ImportError:
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    run_async = asyncio.run
+
 # Retry configuration - Optimized for speed
 MAX_RETRIES = 2  # Reduced retries
 RETRY_DELAY = 2  # Reduced delay
-
-# User agents for rotation
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15"
-]
-
-def get_random_user_agent():
-    """Get a random user agent from the list"""
-    return random.choice(USER_AGENTS)
-
-def sleep_with_jitter(base_delay):
+MAX_CONCURRENCY = 5  # Review pages fetched at the same time
+SAMPLE_SIZE = 25  # Reviews returned, sampled at random when more are available
+REQUEST_TIMEOUT = httpx.Timeout(30)
+
+# AJAX reviews endpoint - returns just the review list fragments instead of the full page
+AJAX_REVIEWS_PATH = "/hz/reviews-render/ajax/reviews/get/"
+AJAX_PAGE_SIZE = 10
+CSRF_TOKEN_FIELD = "anti-csrftoken-a2z"
+_ASIN_RE = re.compile(r'/(?:product-reviews|dp|gp/product)/([A-Z0-9]{10})')
+
+# Response cache configuration - successful page fetches are reused across runs
+CACHE_PATH = os.environ.get("SCRAPER_CACHE_PATH", os.path.join(tempfile.gettempdir(), "revtrack_amazon_cache.sqlite"))
+CACHE_TTL = 3600  # 1 hour in seconds
+# Amazon's robot-check page links this address and comes back as a 200
+CAPTCHA_MARKER = "api-services-support@amazon.com"
+REVIEW_TEXT_MARKER = "review-text"
+
+def get_user_agent_family(user_agent):
+    """Reduce a user agent string to its browser family, used as part of the cache key"""
+    if "Firefox/" in user_agent:
+        return "firefox"
+    if "Chrome/" in user_agent:
+        return "chrome"
+    if "Safari/" in user_agent:
+        return "safari"
+    return "other"
+
+class ResponseCache:
+    """
+    SQLite-backed cache of successful (200) page fetches, keyed by URL and
+    user-agent family so UA rotation still gets family-specific markup.
+    The cache disables itself if the database can't be opened.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        try:
+            self.conn = sqlite3.connect(path)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT NOT NULL, ua_family TEXT NOT NULL, body TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "PRIMARY KEY (url, ua_family))"
+            )
+            # Clean up expired entries
+            self.conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - ttl,))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: Response cache disabled: {e}", file=sys.stderr)
+            self.conn = None
+
+    def get(self, url, ua_family):
+        """Return the cached body if present and still valid, else None"""
+        if self.conn is None:
+            return None
+        try:
+            row = self.conn.execute(
+                "SELECT body FROM responses WHERE url = ? AND ua_family = ? AND fetched_at >= ?",
+                (url, ua_family, time.time() - self.ttl)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Warning: Response cache read failed: {e}", file=sys.stderr)
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, url, ua_family, body):
+        """Store a successful response body"""
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, ua_family, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, ua_family, body, time.time())
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: Response cache write failed: {e}", file=sys.stderr)
+
+    def log_stats(self):
+        """Print the hit/miss rate to stderr"""
+        total = self.hits + self.misses
+        if total:
+            print(f"Response cache: {self.hits} hits, {self.misses} misses ({self.hits / total:.0%} hit rate)", file=sys.stderr)
+
+# Shared cache instance for this process
+response_cache = ResponseCache()
+
+def is_cacheable(body, form=None):
+    """
+    Only cache bodies that actually carry reviews, so a robot-check page or an
+    empty response is never replayed from the cache
+    """
+    if CAPTCHA_MARKER in body:
+        return False
+    if form is not None:
+        return bool(parse_ajax_reviews(body))
+    return REVIEW_TEXT_MARKER in body
+
+async def sleep_with_jitter(base_delay):
     """Sleep with random jitter to avoid detection"""
     jitter = random.uniform(0.5, 1.5)
-    time.sleep(base_delay * jitter)
+    await asyncio.sleep(base_delay * jitter)
 
 def calculate_retry_delay(attempt):
     """Calculate exponential backoff delay"""
     return RETRY_DELAY * (2 ** attempt)
 
-def make_request(url, attempt=0):
-    """Make HTTP request with retry logic and rate limiting handling"""
-    headers = {
-        "User-Agent": get_random_user_agent(),
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Encoding": "gzip, deflate, br",
-        "DNT": "1",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-    }
+def create_http_client():
+    """HTTP/2 client so every review page is multiplexed over one pooled TLS connection"""
+    return httpx.AsyncClient(
+        http2=True,
+        # Connection-level headers aren't allowed over HTTP/2, and DEFAULT_HEADERS leave them out
+        headers=DEFAULT_HEADERS,
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    )
+
+async def make_request(client, url, form=None, headers=None, use_cache=True):
+    """
+    Fetch a page (GET, or POST when form data is given) with caching, retry
+    logic and rate limiting handling. Returns the body text, or None on failure.
+    use_cache=False always goes to the network and doesn't store the result.
+    """
+    # The CSRF token changes per session, so it's left out of the cache key
+    cache_key = url if form is None else f"{url}?{urlencode(sorted((k, v) for k, v in form.items() if k != CSRF_TOKEN_FIELD))}"
+
+    for attempt in range(MAX_RETRIES + 1):
+        user_agent = get_random_user_agent()
+        ua_family = get_user_agent_family(user_agent)
+
+        if use_cache:
+            cached = response_cache.get(cache_key, ua_family)
+            if cached is not None:
+                return cached
+
+        request_headers = {"User-Agent": user_agent, **(headers or {})}
+        try:
+            if form is None:
+                response = await client.get(url, headers=request_headers)
+            else:
+                response = await client.post(url, data=form, headers=request_headers)
+            status = response.status_code
 
-    try:
-        response = requests.get(url, headers=headers, timeout=30)
+        except httpx.TimeoutException:
+            if attempt < MAX_RETRIES:
+                delay = calculate_retry_delay(attempt)
+                print(f"Request timeout. Retrying in {delay} seconds...", file=sys.stderr)
+                await sleep_with_jitter(delay)
+                continue
+            print(f"Request timeout after {MAX_RETRIES} attempts", file=sys.stderr)
+            return None
+
+        except httpx.TransportError:
+            if attempt < MAX_RETRIES:
+                delay = calculate_retry_delay(attempt)
+                print(f"Connection error. Retrying in {delay} seconds...", file=sys.stderr)
+                await sleep_with_jitter(delay)
+                continue
+            print(f"Connection error after {MAX_RETRIES} attempts", file=sys.stderr)
+            return None
+
+        except Exception as e:
+            print(f"Unexpected error: {e}", file=sys.stderr)
+            return None
 
         # Check for rate limiting
-        if response.status_code == 429:
+        if status == 429:
             if attempt < MAX_RETRIES:
                 delay = calculate_retry_delay(attempt)
                 print(f"Rate limited (429). Waiting {delay} seconds before retry...", file=sys.stderr)
-                sleep_with_jitter(delay)
-                return make_request(url, attempt + 1)
-            else:
-                print(f"Rate limit exceeded after {MAX_RETRIES} attempts", file=sys.stderr)
-                return None
+                await sleep_with_jitter(delay)
+                continue
+            print(f"Rate limit exceeded after {MAX_RETRIES} attempts", file=sys.stderr)
+            return None
 
         # Check for other client errors
-        if response.status_code >= 400 and response.status_code < 500:
-            print(f"Client error {response.status_code} for URL: {url}", file=sys.stderr)
+        if status >= 400 and status < 500:
+            print(f"Client error {status} for URL: {url}", file=sys.stderr)
             return None
 
         # Check for server errors
-        if response.status_code >= 500:
+        if status >= 500:
             if attempt < MAX_RETRIES:
                 delay = calculate_retry_delay(attempt)
-                print(f"Server error {response.status_code}. Retrying in {delay} seconds...", file=sys.stderr)
-                sleep_with_jitter(delay)
-                return make_request(url, attempt + 1)
-            else:
-                print(f"Server error {response.status_code} after {MAX_RETRIES} attempts", file=sys.stderr)
-                return None
-
-        return response
-
-    except requests.exceptions.Timeout:
-        if attempt < MAX_RETRIES:
-            delay = calculate_retry_delay(attempt)
-            print(f"Request timeout. Retrying in {delay} seconds...", file=sys.stderr)
-            sleep_with_jitter(delay)
-            return make_request(url, attempt + 1)
-        else:
-            print(f"Request timeout after {MAX_RETRIES} attempts", file=sys.stderr)
+                print(f"Server error {status}. Retrying in {delay} seconds...", file=sys.stderr)
+                await sleep_with_jitter(delay)
+                continue
+            print(f"Server error {status} after {MAX_RETRIES} attempts", file=sys.stderr)
             return None
 
-    except requests.exceptions.ConnectionError:
-        if attempt < MAX_RETRIES:
-            delay = calculate_retry_delay(attempt)
-            print(f"Connection error. Retrying in {delay} seconds...", file=sys.stderr)
-            sleep_with_jitter(delay)
-            return make_request(url, attempt + 1)
-        else:
-            print(f"Connection error after {MAX_RETRIES} attempts", file=sys.stderr)
+        if status != 200:
             return None
 
-    except Exception as e:
-        print(f"Unexpected error: {e}", file=sys.stderr)
-        return None
+        body = response.text
+        if use_cache and is_cacheable(body, form):
+            response_cache.set(cache_key, ua_family, body)
+        elif use_cache:
+            print(f"Response for {url} has no reviews (blocked?), not caching it", file=sys.stderr)
+        return body
 
-if len(sys.argv) < 2:
-    print(json.dumps({"error": "Please provide the Amazon review URL."}))
+args, pretty = parse_output_args(sys.argv)
+if not args:
+    print(dumps({"error": "Please provide the Amazon review URL."}))
     sys.exit(1)
 
-reviews_url = sys.argv[1]
+reviews_url = args[0]
 max_pages = 3  # Reduced from 10 to 3 for faster processing
 
-def reviewsHtml(url, max_pages):
-    """Scrape review pages with improved error handling"""
-    soups = []
-
-    for page_no in range(1, max_pages + 1):
-        # Construct the paginated URL
-        paginated_url = f"{url}/ref=cm_cr_getr_d_paging_btm_next_{page_no}?pageNumber={page_no}"
+async def fetch_review_page(client, semaphore, url, page_no, max_pages, use_cache=True):
+    """Fetch one review page, waiting for a free concurrency slot first"""
+    # Construct the paginated URL
+    paginated_url = f"{url}/ref=cm_cr_getr_d_paging_btm_next_{page_no}?pageNumber={page_no}"
 
+    async with semaphore:
         print(f"Scraping page {page_no}/{max_pages}", file=sys.stderr)
+        html = await make_request(client, paginated_url, use_cache=use_cache)
 
-        response = make_request(paginated_url)
+    if html is None:
+        print(f"Failed to retrieve page {page_no}.", file=sys.stderr)
+    return html
 
-        if response and response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            soups.append(soup)
+def find_csrf_token(html):
+    """Read the reviews CSRF token embedded in a review page's #cr-state-object"""
+    node = LexborHTMLParser(html).css_first('#cr-state-object')
+    if node is None:
+        return None
+    try:
+        return json.loads(node.attributes.get('data-state') or '{}').get('reviewsCsrfToken')
+    except ValueError:
+        return None
 
-            # Shorter delay between pages for speed
-            if page_no < max_pages:
-                sleep_with_jitter(1)  # Reduced to 1 second between pages
+def parse_ajax_reviews(body):
+    """
+    Join the HTML fragments of an AJAX reviews response. The body is a series
+    of "&&&"-delimited JSON arrays whose third element is an HTML fragment.
+    """
+    fragments = []
+    for chunk in body.split('&&&'):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        try:
+            parts = json.loads(chunk)
+        except ValueError:
+            continue
+        if len(parts) >= 3 and isinstance(parts[2], str):
+            fragments.append(parts[2])
+    return ''.join(fragments)
+
+async def fetch_ajax_review_page(client, semaphore, url, asin, token, page_no, max_pages):
+    """Fetch one page of reviews from the AJAX endpoint, falling back to the HTML page"""
+    parsed = urlparse(url)
+    endpoint = f"{parsed.scheme}://{parsed.netloc}{AJAX_REVIEWS_PATH}"
+    form = {
+        "asin": asin,
+        "sortBy": "recent",
+        "reviewerType": "all_reviews",
+        "pageNumber": str(page_no),
+        "pageSize": str(AJAX_PAGE_SIZE),
+        "scope": f"reviewsAjax{page_no}",
+        CSRF_TOKEN_FIELD: token,
+    }
+    headers = {CSRF_TOKEN_FIELD: token, "X-Requested-With": "XMLHttpRequest"}
+
+    async with semaphore:
+        print(f"Scraping page {page_no}/{max_pages} (ajax)", file=sys.stderr)
+        body = await make_request(client, endpoint, form=form, headers=headers)
+
+    html = parse_ajax_reviews(body) if body else None
+    if html:
+        return html
+
+    print(f"AJAX reviews failed for page {page_no}, using the HTML page", file=sys.stderr)
+    return await fetch_review_page(client, semaphore, url, page_no, max_pages)
+
+async def reviewsHtml(url, max_pages):
+    """
+    Scrape review pages over one HTTP/2 client and return their HTML. Page 1
+    is the regular review page, which also carries the CSRF token; the rest
+    come concurrently from the much smaller AJAX endpoint when possible.
+    """
+    semaphore = asyncio.BoundedSemaphore(MAX_CONCURRENCY)
+    asin_match = _ASIN_RE.search(urlparse(url).path)
+
+    async with create_http_client() as client:
+        # Page 1 always comes from the network: its CSRF token is bound to the session
+        # cookies this client receives with it, so a cached copy's token would be rejected
+        first_page = await fetch_review_page(client, semaphore, url, 1, max_pages, use_cache=False)
+        token = find_csrf_token(first_page) if first_page else None
+
+        if asin_match and token:
+            fetches = (
+                fetch_ajax_review_page(client, semaphore, url, asin_match.group(1), token, page_no, max_pages)
+                for page_no in range(2, max_pages + 1)
+            )
         else:
-            print(f"Failed to retrieve page {page_no}.", file=sys.stderr)
-            break
-
-    return soups
-
-def extract_reviews(soups):
-    """Extract reviews from scraped pages"""
-    review_texts_list = []
-    review_ratings_list = []
-
-    for soup in soups:
-        # Extract review texts
-        review_texts = soup.find_all("span", class_="review-text")
-        review_texts_list.extend([text.text.strip() for text in review_texts])
-
-        # Extract review ratings
-        review_ratings = soup.find_all("i", class_="review-rating")
-        review_ratings_list.extend([rating.text.strip() for rating in review_ratings])
+            print("No reviews CSRF token found, using HTML review pages", file=sys.stderr)
+            fetches = (
+                fetch_review_page(client, semaphore, url, page_no, max_pages)
+                for page_no in range(2, max_pages + 1)
+            )
+        htmls = [first_page, *await asyncio.gather(*fetches)]
+
+    response_cache.log_stats()
+
+    return [html for html in htmls if html]
+
+def review_item(text_node, rating_node):
+    """Build the output dict for one review"""
+    return {"Description": text_node.text().strip(), "Stars": rating_node.text().strip()}
+
+def extract_reviews_sampled(pages, k=SAMPLE_SIZE):
+    """
+    Extract a uniform random sample of at most k reviews from scraped pages,
+    reservoir-sampling while iterating so only k review dicts are ever built.
+    Returns the sample and the total number of reviews seen.
+    """
+    sample = []
+    seen = 0
+
+    for html in pages:
+        # selectolax's C-backed lexbor parser is much faster than BeautifulSoup's html.parser
+        tree = LexborHTMLParser(html)
+
+        for text_node, rating_node in zip(tree.css("span.review-text"), tree.css("i.review-rating")):
+            seen += 1
+            if len(sample) < k:
+                sample.append(review_item(text_node, rating_node))
+            else:
+                j = random.randrange(seen)
+                if j < k:
+                    sample[j] = review_item(text_node, rating_node)
 
-    # Combine extracted fields into a structured list of dictionaries
-    all_reviews = [
-        {"Description": text, "Stars": rating}
-        for text, rating in zip(review_texts_list, review_ratings_list)
-    ]
-    return all_reviews
+    return sample, seen
 
 # Main execution
 if __name__ == "__main__":
+    start_memory_trace()
     try:
         print("Starting review scraping...", file=sys.stderr)
-        soups = reviewsHtml(reviews_url, max_pages)
+        pages = run_async(reviewsHtml(reviews_url, max_pages))
 
-        if soups:
-            all_reviews = extract_reviews(soups)
-            print(f"Extracted {len(all_reviews)} reviews", file=sys.stderr)
-
-            # Randomly select 25 reviews if more than 25 are available (reduced for speed)
-            if len(all_reviews) > 25:
-                selected_reviews = random.sample(all_reviews, 25)
-            else:
-                selected_reviews = all_reviews
+        if pages:
+            selected_reviews, total_reviews = extract_reviews_sampled(pages)
+            print(f"Extracted {total_reviews} reviews", file=sys.stderr)
 
             # Output the JSON data
-            print(json.dumps(selected_reviews, indent=2, ensure_ascii=False))
+            print(dumps(selected_reviews, pretty=pretty))
         else:
-            print(json.dumps({"error": "No data retrieved from any pages."}))
+            print(dumps({"error": "No data retrieved from any pages."}))
 
     except Exception as e:
-        print(json.dumps({"error": f"An error occurred: {str(e)}"}))
+        print(dumps({"error": f"An error occurred: {str(e)}"}))
         sys.exit(1)
+    finally:
+        report_memory_trace()
@@ -30,6 +30,28 @@ def test_imports():
         print(f"❌ Failed to import BeautifulSoup: {e}")
         return False
     
+    try:
+        import aiohttp
+        print("✅ aiohttp imported successfully")
+    except ImportError as e:
+        print(f"❌ Failed to import aiohttp: {e}")
+        return False
+    
+    try:
+        import httpx
+        import h2
+        print("✅ httpx (HTTP/2) imported successfully")
+    except ImportError as e:
+        print(f"❌ Failed to import httpx with HTTP/2 support: {e}")
+        return False
+    
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        print("✅ selectolax imported successfully")
+    except ImportError as e:
+        print(f"❌ Failed to import selectolax: {e}")
+        return False
+    
     return True
 
 def test_playwright_browsers():